@@ -1,100 +1,117 @@
 import os
+import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from shlex import quote
 from .utils import (
     run_cmd,
+    batch_copy,
     get_abs_path_subfiles,
     exit_if_dir_is_empty,
     safe_mkdir,
     evaluate_condition,
-    find_path_for_permission_error_reporting,
 )
 from .printing import *
 from colorama import Fore, Style
 from .compatibility import *
 from .config import get_config
-from pathlib import Path, PurePath
-from shutil import copytree, copyfile, copy
+from shutil import copytree, copy
 
 # NOTE: Naming convention is like this since the CLI flags would otherwise
 #       conflict with the function names.
 
 
 def reinstall_dots_sb(
-    dots_path: str, home_path: str = os.path.expanduser("~"), dry_run: bool = False
+    dots_path: str,
+    home_path: str = os.path.expanduser("~"),
+    dry_run: bool = False,
+    config: dict = None,
 ):
     """Reinstall all dotfiles and folders by copying them from dots_path
-    to a path relative to home_path, or to an absolute path."""
+    to a path relative to home_path, or to an absolute path.
+    If config is not passed in, it is read from disk."""
     exit_if_dir_is_empty(dots_path, "dotfile")
     print_section_header("REINSTALLING DOTFILES", Fore.BLUE)
 
     # Get paths of ALL files that we will be reinstalling from config.
     # 	If .ssh is in the config, full paths of all dots_path/.ssh/* files
-    # 	will be in dotfiles_to_reinstall
-    config = get_config()["dotfiles"]
-
-    dotfiles_to_reinstall = []
-    for dotfile_path_from_config, options in config.items():
-        # Evaluate condition, if specified. Skip if the command doesn't return true.
-        condition_success = evaluate_condition(
-            condition=options.get("reinstall_condition", ""),
-            backup_or_reinstall="reinstall",
-            dotfile_path=dotfile_path_from_config,
-        )
-        if not condition_success:
-            continue
-
-        if dotfile_path_from_config.startswith("/"):
-            dotfile_path_from_config = ":" + dotfile_path_from_config[1:]
-
-        real_path_dotfile = os.path.join(dots_path, dotfile_path_from_config)
-        if os.path.isfile(real_path_dotfile):
-            dotfiles_to_reinstall.append(real_path_dotfile)
-        else:
-            subfiles_to_add = get_abs_path_subfiles(real_path_dotfile)
-            dotfiles_to_reinstall.extend(subfiles_to_add)
+    # 	will be yielded by dotfiles_to_reinstall
+    if config is None:
+        config = get_config()
+
+    def dotfiles_to_reinstall():
+        for dotfile_path_from_config, options in config["dotfiles"].items():
+            # Evaluate condition, if specified. Skip if the command doesn't return true.
+            condition_success = evaluate_condition(
+                condition=options.get("reinstall_condition", ""),
+                backup_or_reinstall="reinstall",
+                dotfile_path=dotfile_path_from_config,
+            )
+            if not condition_success:
+                continue
+
+            if dotfile_path_from_config.startswith("/"):
+                dotfile_path_from_config = ":" + dotfile_path_from_config[1:]
+
+            real_path_dotfile = os.path.join(dots_path, dotfile_path_from_config)
+            try:
+                mode = os.stat(real_path_dotfile).st_mode
+            except OSError:
+                continue
+            if stat.S_ISREG(mode):
+                yield real_path_dotfile
+            elif stat.S_ISDIR(mode):
+                yield from get_abs_path_subfiles(real_path_dotfile)
 
     reinstallation_error_count = 0
     # Create list of tuples containing source and dest paths for dotfile reinstallation
     # The absolute file paths prepended with ':' are converted back to valid paths
     # Format: [(source, dest), ... ]
     full_path_dotfiles_to_reinstall = []
-    for source in dotfiles_to_reinstall:
+    abs_path_start = os.path.join(dots_path, ":")
+    abs_path_start_len = len(abs_path_start)
+    dots_path_len = len(dots_path)
+    for source in dotfiles_to_reinstall():
         # If it's an absolute path, dest is the corrected path
-        abs_path_start = os.path.join(dots_path, ":")
         if source.startswith(abs_path_start):
-            dest = "/" + source[len(abs_path_start) :]
+            dest = "/" + source[abs_path_start_len:]
         else:
-            # Otherwise, it should go in a path relative to the home path
-            dest = source.replace(dots_path, home_path + "/")
-        full_path_dotfiles_to_reinstall.append((Path(source), Path(dest)))
+            # Otherwise, it should go in a path relative to the home path.
+            # Every source starts with dots_path, so slice it off. str.replace would also
+            # rewrite any later occurrence of dots_path inside the path.
+            dest = os.path.join(home_path, source[dots_path_len:].lstrip(os.sep))
+        full_path_dotfiles_to_reinstall.append((source, dest))
 
     files_with_permission_errors = set()
-    # Copy files from backup to system
-    for dot_source, dot_dest in full_path_dotfiles_to_reinstall:
-        if dry_run:
+    if dry_run:
+        for dot_source, dot_dest in full_path_dotfiles_to_reinstall:
             print_dry_run_copy_info(dot_source, dot_dest)
-            continue
-
-        # Create dest parent dir if it doesn't exist
-        # One case that this can fail is if dot_dest.parent is a FILE. We will try-catch this case specifically.
+    else:
+        # Check and create each unique dest parent dir once, instead of once per file.
+        # One case that this can fail is if the parent of dot_dest is a FILE. We will try-catch this case specifically.
         # https://github.com/alichtman/shallow-backup/issues/343#issuecomment-2120024456
-        parent_dir = dot_dest.parent
-        if os.path.isfile(parent_dir):
-            print(
-                f"{Fore.RED}{Style.BRIGHT}ERROR: {Style.NORMAL}{parent_dir}{Style.BRIGHT} is a file, however, this reinstallation process attempts to create {Style.NORMAL}{dot_dest}{Style.BRIGHT}, which would use that path as a directory. You will have to manually remediate this issue (likely by renaming or moving {Style.NORMAL}{dot_dest.parent}{Style.BRIGHT}){Style.NORMAL}{Style.RESET_ALL}"
-            )
-            reinstallation_error_count += 1
-            continue
-
-        safe_mkdir(dot_dest.parent)
-        try:
-            copy(dot_source, dot_dest)
-        except PermissionError as err:
-            files_with_permission_errors.add(
-                find_path_for_permission_error_reporting(err.filename)
-            )
-        except FileNotFoundError as err:
-            print_red_bold(f"ERROR: {err}")
+        dest_parent_dirs = {
+            os.path.dirname(dot_dest) for _, dot_dest in full_path_dotfiles_to_reinstall
+        }
+        parents_that_are_files = set()
+        for parent_dir in dest_parent_dirs:
+            if os.path.isfile(parent_dir):
+                parents_that_are_files.add(parent_dir)
+            else:
+                safe_mkdir(parent_dir)
+
+        pairs_to_copy = []
+        for dot_source, dot_dest in full_path_dotfiles_to_reinstall:
+            parent_dir = os.path.dirname(dot_dest)
+            if parent_dir in parents_that_are_files:
+                print(
+                    f"{Fore.RED}{Style.BRIGHT}ERROR: {Style.NORMAL}{parent_dir}{Style.BRIGHT} is a file, however, this reinstallation process attempts to create {Style.NORMAL}{dot_dest}{Style.BRIGHT}, which would use that path as a directory. You will have to manually remediate this issue (likely by renaming or moving {Style.NORMAL}{parent_dir}{Style.BRIGHT}){Style.NORMAL}{Style.RESET_ALL}"
+                )
+                reinstallation_error_count += 1
+                continue
+            pairs_to_copy.append((dot_source, dot_dest))
+
+        # Copy files from backup to system
+        files_with_permission_errors = batch_copy(pairs_to_copy)
 
     if reinstallation_error_count != 0:
         print_red_bold(f"\nSome errors which require manual resolution detected.")
@@ -115,34 +132,58 @@ def reinstall_fonts_sb(fonts_path: str, dry_run: bool = False):
     print_section_header("REINSTALLING FONTS", Fore.BLUE)
 
     # Copy every file in fonts_path to ~/Library/Fonts
-    for font in get_abs_path_subfiles(fonts_path):
-        fonts_dir = get_fonts_dir()
-        dest_path = quote(os.path.join(fonts_dir, font.split("/")[-1]))
-        if dry_run:
+    fonts_dir = get_fonts_dir()
+    fonts_to_reinstall = [
+        (font, os.path.join(fonts_dir, os.path.basename(font)))
+        for font in get_abs_path_subfiles(fonts_path)
+    ]
+    if dry_run:
+        for font, dest_path in fonts_to_reinstall:
             print_dry_run_copy_info(font, dest_path)
-            continue
-        copyfile(quote(font), quote(dest_path))
+    else:
+        fonts_with_permission_errors = batch_copy(fonts_to_reinstall)
+        if fonts_with_permission_errors:
+            print_red_bold("Permission errors while reinstalling these fonts:")
+            print_list_pretty(sorted(fonts_with_permission_errors))
     print_section_header("FONT REINSTALLATION COMPLETED", Fore.BLUE)
 
 
-def reinstall_configs_sb(configs_path: str, dry_run: bool = False):
-    """Reinstall all configs from the backup."""
+def reinstall_configs_sb(configs_path: str, dry_run: bool = False, config: dict = None):
+    """Reinstall all configs from the backup.
+    If config is not passed in, it is read from disk."""
     exit_if_dir_is_empty(configs_path, "config")
     print_section_header("REINSTALLING CONFIG FILES", Fore.BLUE)
 
-    config = get_config()
-    for dest_path, backup_loc in config["config_mapping"].items():
-        dest_path = quote(dest_path)
-        source_path = quote(os.path.join(configs_path, backup_loc))
-
-        if dry_run:
+    if config is None:
+        config = get_config()
+    configs_to_reinstall = [
+        (os.path.join(configs_path, backup_loc), dest_path)
+        for dest_path, backup_loc in config["config_mapping"].items()
+    ]
+    if dry_run:
+        for source_path, dest_path in configs_to_reinstall:
             print_dry_run_copy_info(source_path, dest_path)
-            continue
-
-        if os.path.isdir(source_path):
-            copytree(source_path, dest_path)
-        elif os.path.isfile(source_path):
-            copyfile(source_path, dest_path)
+    elif configs_to_reinstall:
+
+        def reinstall_config(source_path, dest_path):
+            try:
+                mode = os.stat(source_path).st_mode
+            except OSError:
+                return
+            if stat.S_ISDIR(mode):
+                copytree(source_path, dest_path, dirs_exist_ok=True)
+            elif stat.S_ISREG(mode):
+                copy(source_path, dest_path)
+
+        # Each config is copied to a different destination, so copy them concurrently
+        max_workers = min(8, len(configs_to_reinstall))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(reinstall_config, source_path, dest_path)
+                for source_path, dest_path in configs_to_reinstall
+            ]
+            for future in as_completed(futures):
+                future.result()
 
     print_section_header("CONFIG REINSTALLATION COMPLETED", Fore.BLUE)
 
@@ -150,11 +191,20 @@ def reinstall_configs_sb(configs_path: str, dry_run: bool = False):
 def reinstall_packages_sb(packages_path: str, dry_run: bool = False):
     """Reinstall all packages from the files in backup/installs."""
 
-    def run_cmd_if_no_dry_run(command, dry_run) -> int:
+    def run_cmd_if_no_dry_run(command, dry_run, input_path=None) -> int:
         if dry_run:
-            print_yellow_bold(f"$ {command}")
+            redirect = f" < {input_path}" if input_path else ""
+            print_yellow_bold(f"$ {command}{redirect}")
             # Return 0 for any processes depending on chained successful commands
             return 0
+        elif input_path:
+            try:
+                input_file = open(input_path, "rb")
+            except OSError as err:
+                print_red_bold(f"ERROR: Can't read {input_path}: {err.strerror}")
+                return 1
+            with input_file:
+                return run_cmd(command, stdin=input_file)
         else:
             return run_cmd(command)
 
@@ -162,61 +212,91 @@ def reinstall_packages_sb(packages_path: str, dry_run: bool = False):
     print_section_header("REINSTALLING PACKAGES", Fore.BLUE)
 
     # Figure out which install lists they have saved
+    package_list_prefixes = (
+        "gem_",
+        "cargo_",
+        "npm_",
+        "pip_",
+        "pip3_",
+        "brew_",
+        "vscode_",
+        "macports_",
+    )
     package_mgrs = set()
     for file in os.listdir(packages_path):
-        manager = file.split("_")[0].replace("-", " ")
-        if manager in [
-            "gem",
-            "cargo",
-            "npm",
-            "pip",
-            "pip3",
-            "brew",
-            "vscode",
-            "macports",
-        ]:
-            package_mgrs.add(file.split("_")[0])
+        for prefix in package_list_prefixes:
+            if file.startswith(prefix):
+                package_mgrs.add(prefix[:-1])
+                break
 
     print_blue_bold("Package Manager Backups Found:")
     for mgr in package_mgrs:
         print_yellow("\t{}".format(mgr))
     print()
 
-    # TODO: Multithreading for reinstallation.
-    # Construct reinstallation commands and execute them
+    # Construct reinstallation commands for each package manager, along with
+    # the list file to feed to their stdin, if any.
+    reinstall_cmds = {
+        "brew": (
+            f"brew bundle install --no-lock --file {quote(packages_path)}/brew_list.txt",
+            None,
+        ),
+        "npm": ("xargs npm install -g", f"{packages_path}/npm_list.txt"),
+        "pip": (f"pip install -r {quote(packages_path)}/pip_list.txt", None),
+        "pip3": (f"pip3 install -r {quote(packages_path)}/pip3_list.txt", None),
+        "gem": ("xargs -L 1 gem install", f"{packages_path}/gem_list.txt"),
+        "cargo": ("xargs -L 1 cargo install", f"{packages_path}/cargo_list.txt"),
+    }
+
+    # Group the commands into jobs that can run at the same time. pip and pip3
+    # often share a site-packages dir, so they go in the same job.
+    jobs = {}
     for pm in package_mgrs:
-        if pm == "brew":
-            print_pkg_mgr_reinstall(pm)
-            cmd = f"brew bundle install --no-lock --file {packages_path}/brew_list.txt"
-            run_cmd_if_no_dry_run(cmd, dry_run)
-        elif pm == "npm":
-            print_pkg_mgr_reinstall(pm)
-            cmd = f"cat {packages_path}/npm_list.txt | xargs npm install -g"
-            run_cmd_if_no_dry_run(cmd, dry_run)
-        elif pm == "pip":
-            print_pkg_mgr_reinstall(pm)
-            cmd = f"pip install -r {packages_path}/pip_list.txt"
-            run_cmd_if_no_dry_run(cmd, dry_run)
-        elif pm == "pip3":
-            print_pkg_mgr_reinstall(pm)
-            cmd = f"pip3 install -r {packages_path}/pip3_list.txt"
-            run_cmd_if_no_dry_run(cmd, dry_run)
-        elif pm == "vscode":
-            print_pkg_mgr_reinstall(pm)
-            with open(f"{packages_path}/vscode_list.txt", "r") as file:
-                for package in file:
-                    cmd = f"code --install-extension {package}"
-                    run_cmd_if_no_dry_run(cmd, dry_run)
-        elif pm == "macports":
+        if pm == "macports":
             print_red_bold("WARNING: Macports reinstallation is not supported.")
-        elif pm == "gem":
-            print_pkg_mgr_reinstall(pm)
-            cmd = f"cat {packages_path}/gem_list.txt | xargs -L 1 gem install"
-            run_cmd_if_no_dry_run(cmd, dry_run)
-        elif pm == "cargo":
-            print_pkg_mgr_reinstall(pm)
-            cmd = f"cat {packages_path}/cargo_list.txt | xargs -L 1 cargo install"
-            run_cmd_if_no_dry_run(cmd, dry_run)
+            continue
+        if pm == "vscode":
+            # code accepts multiple --install-extension flags, so install them all
+            # with one invocation instead of starting code once per extension.
+            with open(f"{packages_path}/vscode_list.txt", "r") as file:
+                extensions = [line.strip() for line in file if line.strip()]
+            install_flags = " ".join(
+                f"--install-extension {quote(extension)}" for extension in extensions
+            )
+            commands = [(f"code {install_flags}", None)] if extensions else []
+        else:
+            commands = [reinstall_cmds[pm]]
+        job_name = "pip" if pm == "pip3" else pm
+        jobs.setdefault(job_name, []).append((pm, commands))
+
+    # brew usually installs the other package managers (node, ruby, rust, python,
+    # the VSCode CLI), so it runs on its own before the rest start.
+    brew_job = jobs.pop("brew", [])
+
+    def run_job(job):
+        for _, commands in job:
+            for command, input_path in commands:
+                run_cmd_if_no_dry_run(command, dry_run, input_path)
+
+    # Dry runs print each package manager's header right before its commands
+    if dry_run:
+        for job in [brew_job, *jobs.values()]:
+            for pm, commands in job:
+                print_pkg_mgr_reinstall(pm)
+                run_job([(pm, commands)])
+    else:
+        for job in [brew_job, *jobs.values()]:
+            for pm, _ in job:
+                print_pkg_mgr_reinstall(pm)
+
+        run_job(brew_job)
+        # The remaining package managers are independent of each other,
+        # so reinstall with all of them at once.
+        if jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = [executor.submit(run_job, job) for job in jobs.values()]
+                for future in as_completed(futures):
+                    future.result()
 
     print_section_header("PACKAGE REINSTALLATION COMPLETED", Fore.BLUE)
 
@@ -228,8 +308,11 @@ def reinstall_all_sb(
     configs_path: str,
     dry_run: bool = False,
 ):
-    """Call all reinstallation methods."""
-    reinstall_dots_sb(dotfiles_path, dry_run=dry_run)
+    """Call all reinstallation methods.
+    Dotfiles and configs are restored first, since package managers read them
+    (e.g. ~/.ssh and ~/.config/git for git-based installs)."""
+    config = get_config()
+    reinstall_dots_sb(dotfiles_path, dry_run=dry_run, config=config)
+    reinstall_configs_sb(configs_path, dry_run=dry_run, config=config)
     reinstall_packages_sb(packages_path, dry_run=dry_run)
     reinstall_fonts_sb(fonts_path, dry_run=dry_run)
-    reinstall_configs_sb(configs_path, dry_run=dry_run)
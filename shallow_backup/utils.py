@@ -4,10 +4,11 @@ from colorama import Fore
 import subprocess as sp
 from shlex import split
 import shutil
-from shutil import rmtree, copytree, copyfile
+from shutil import rmtree, copytree, copyfile, copy
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from re import fullmatch
-from typing import Union, List
+from typing import Union, List, Tuple, Iterable, Iterator, Set
 from .printing import (
     print_path_red,
     print_red_bold,
@@ -18,10 +19,12 @@ from .printing import (
 )
 
 
-def run_cmd(command: Union[str, List]):
+def run_cmd(command: Union[str, List], stdin=None):
     """
     Wrapper on subprocess.run to handle shell commands as either a list of args
-    or a single string.
+    or a single string. Commands are exec'd directly, not through a shell, so
+    `|` is the only shell operator supported. Each side of a pipe is wired up here.
+    :param stdin: Optional open file to feed to the first command's stdin
     """
     if not isinstance(command, list):
         command = split(command)
@@ -32,14 +35,14 @@ def run_cmd(command: Union[str, List]):
             first_command, command = command[:index], command[index + 1 :]
             output = sp.Popen(
                 first_command,
-                stdin=output.stdout if output else None,
+                stdin=output.stdout if output else stdin,
                 stdout=sp.PIPE,
                 stderr=sp.DEVNULL,
             )
         return sp.run(
             command,
             stdout=sp.PIPE,
-            stdin=output.stdout if output else None,
+            stdin=output.stdout if output else stdin,
             stderr=sp.DEVNULL,
         )
     except FileNotFoundError:  # If package manager is missing
@@ -107,6 +110,10 @@ def check_if_path_is_valid_dir(abs_path):
 
 def safe_mkdir(directory):
     """Makes dir if it doesn't already exist, creating all intermediate directories."""
+    # A single stat is cheaper than os.makedirs, which stats the parent, attempts
+    # the mkdir, and then stats again to confirm EEXIST came from a dir.
+    if os.path.isdir(directory):
+        return
     os.makedirs(directory, exist_ok=True)
 
 
@@ -190,16 +197,28 @@ def destroy_backup_dir(backup_path):
         print_red_bold("Error: {} - {}".format(e.filename, e.strerror))
 
 
-def get_abs_path_subfiles(directory: str) -> list:
-    """Returns list of absolute paths of files and folders contained in a directory,
+def get_abs_path_subfiles(directory: str) -> Iterator[str]:
+    """Yields absolute paths of files contained in a directory and its subdirectories.
+    Like os.walk, symlinks to directories are not followed and unreadable directories are skipped.
     :param directory: Absolute path to directory to search
     """
-    file_paths = []
-    for path, _, files in os.walk(directory):
-        for name in files:
-            full_path = os.path.join(path, name)
-            file_paths.append(full_path)
-    return file_paths
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    yield entry.path
+                elif not entry.is_symlink():
+                    subdirs.append(entry.path)
+    except OSError:
+        return
+
+    for subdir in subdirs:
+        yield from get_abs_path_subfiles(subdir)
 
 
 def copyfile_with_exception_handler(src, dst):
@@ -210,6 +229,48 @@ def copyfile_with_exception_handler(src, dst):
         print_red(" -> This may mean you have an error in your config.")
 
 
+def batch_copy(pairs: Iterable[Tuple[str, str]], copy_function=copy) -> Set[str]:
+    """
+    Copy every (source, dest) pair with a pool of worker threads. Destination parent
+    dirs must already exist. Copies are small and I/O-bound, so overlapping them hides
+    most of the per-file syscall latency.
+    :param pairs: Iterable of (source, dest) paths
+    :param copy_function: Function called as copy_function(source, dest) for each pair
+    :return: Set of paths that could not be written due to permission errors.
+    """
+
+    def copy_pair(source, dest):
+        try:
+            copy_function(source, dest)
+        except (PermissionError, FileNotFoundError) as err:
+            return err
+        return None
+
+    pairs = list(pairs)
+    # Starting worker threads costs more than it saves for a handful of files
+    if len(pairs) < 16:
+        errors = [copy_pair(source, dest) for source, dest in pairs]
+    else:
+        errors = []
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(copy_pair, source, dest) for source, dest in pairs
+            ]
+            for future in as_completed(futures):
+                errors.append(future.result())
+
+    files_with_permission_errors = set()
+    for err in filter(None, errors):
+        if isinstance(err, PermissionError):
+            files_with_permission_errors.add(
+                find_path_for_permission_error_reporting(err.filename)
+            )
+        else:
+            print_red_bold(f"ERROR: {err}")
+    return files_with_permission_errors
+
+
 def copy_dir_if_valid(source_dir, backup_path):
     """
     Copy dir from source_dir to backup_path. Skips copying if any of the
@@ -1,6 +1,8 @@
 import os
 import sys
 import pytest
+import shutil
+import threading
 from .testing_utility_functions import (
     clean_up_dirs_and_env_vars,
     BACKUP_DEST_DIR,
@@ -11,7 +13,7 @@ from .testing_utility_functions import (
 )
 
 sys.path.insert(0, "../shallow_backup")
-from shallow_backup.utils import copy_dir_if_valid
+from shallow_backup.utils import copy_dir_if_valid, batch_copy
 
 
 class TestCopyMethods:
@@ -51,3 +53,84 @@ class TestCopyMethods:
         """
         copy_dir_if_valid(invalid, FAKE_HOME_DIR)
         assert not os.path.isdir(os.path.join(BACKUP_DEST_DIR, invalid))
+
+    @staticmethod
+    def create_batch_copy_pairs(num_files):
+        """Create num_files source files spread over several dirs, and return
+        (source, dest) pairs that mirror them into BACKUP_DEST_DIR"""
+        create_dir_overwrite(BACKUP_DEST_DIR)
+        pairs = []
+        for i in range(num_files):
+            subdir = f"dir-{i % 4}"
+            for root in [FAKE_HOME_DIR, BACKUP_DEST_DIR]:
+                os.makedirs(os.path.join(root, subdir), exist_ok=True)
+            source = os.path.join(FAKE_HOME_DIR, subdir, f"file-{i}.txt")
+            with open(source, "w+") as file:
+                file.write(f"CONTENT {i}")
+            pairs.append(
+                (source, os.path.join(BACKUP_DEST_DIR, subdir, f"file-{i}.txt"))
+            )
+        return pairs
+
+    def test_batch_copy(self):
+        """
+        Test that batch copying copies every file on worker threads and reports
+        no permission errors
+        """
+        pairs = self.create_batch_copy_pairs(40)
+        copying_threads = set()
+
+        def copy_and_record_thread(source, dest):
+            copying_threads.add(threading.current_thread())
+            return shutil.copy(source, dest)
+
+        assert batch_copy(pairs, copy_function=copy_and_record_thread) == set()
+        assert threading.main_thread() not in copying_threads
+        for i, (_, dest) in enumerate(pairs):
+            with open(dest) as file:
+                assert file.read() == f"CONTENT {i}"
+
+    def test_batch_copy_errors(self, capsys):
+        """
+        Test that errors raised on worker threads are collected: permission errors
+        are returned, and missing files are reported
+        """
+        pairs = self.create_batch_copy_pairs(20)
+        read_only_dest = pairs[3][1]
+        git_object_dest = os.path.join(
+            BACKUP_DEST_DIR, "repo/.git/objects/ab/cdef0123456789"
+        )
+        pairs.append((pairs[0][0], git_object_dest))
+        missing_source = os.path.join(FAKE_HOME_DIR, "missing.txt")
+        pairs.append((missing_source, os.path.join(BACKUP_DEST_DIR, "missing.txt")))
+
+        def copy_with_permission_errors(source, dest):
+            if dest in (read_only_dest, git_object_dest):
+                raise PermissionError(13, "Permission denied", dest)
+            return shutil.copy(source, dest)
+
+        files_with_permission_errors = batch_copy(
+            pairs, copy_function=copy_with_permission_errors
+        )
+        assert files_with_permission_errors == {
+            read_only_dest,
+            os.path.join(BACKUP_DEST_DIR, "repo/.git"),
+        }
+        assert missing_source in capsys.readouterr().out
+        assert os.path.isfile(pairs[4][1])
+
+    def test_batch_copy_dest_symlinked_to_source(self):
+        """
+        Test that batch copying onto a symlink that points back at the source
+        (stow-style dotfiles) refuses to copy instead of truncating the source
+        """
+        source = os.path.join(FAKE_HOME_DIR, "bashrc")
+        with open(source, "w+") as file:
+            file.write("TRASH")
+        dest = os.path.join(FAKE_HOME_DIR, ".bashrc")
+        os.symlink(source, dest)
+
+        with pytest.raises(shutil.SameFileError):
+            batch_copy([(source, dest)])
+        with open(source) as file:
+            assert file.read() == "TRASH"
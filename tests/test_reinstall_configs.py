@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, "../shallow_backup")
+from shallow_backup.reinstall import reinstall_configs_sb
+
+
+class TestReinstallConfigs:
+    """
+    Test the functionality of reinstalling configs
+    """
+
+    def test_reinstall_configs(self, tmp_path):
+        """
+        Test that config dirs and files are copied to their destinations,
+        including into dirs that already exist
+        """
+        configs_path = os.path.join(tmp_path, "configs")
+        dest_root = os.path.join(tmp_path, "home")
+        config_mapping = {}
+        for i in range(10):
+            source_dir = os.path.join(configs_path, f"app{i}/nested")
+            os.makedirs(source_dir)
+            with open(os.path.join(source_dir, "settings.json"), "w+") as f:
+                f.write(f"SETTINGS {i}")
+            config_mapping[os.path.join(dest_root, f"app{i}")] = f"app{i}"
+        with open(os.path.join(configs_path, "single.conf"), "w+") as f:
+            f.write("SINGLE")
+        os.makedirs(dest_root)
+        config_mapping[os.path.join(dest_root, "single.conf")] = "single.conf"
+        config_mapping[os.path.join(dest_root, "missing")] = "not-backed-up"
+
+        # An existing destination dir is merged into, not an error
+        existing_dir = os.path.join(dest_root, "app0")
+        os.makedirs(existing_dir)
+        with open(os.path.join(existing_dir, "keep.txt"), "w+") as f:
+            f.write("KEEP")
+
+        source_file = os.path.join(configs_path, "app1/nested/settings.json")
+        os.utime(source_file, (1000000000, 1000000000))
+
+        reinstall_configs_sb(configs_path, config={"config_mapping": config_mapping})
+
+        for i in range(10):
+            with open(os.path.join(dest_root, f"app{i}/nested/settings.json")) as f:
+                assert f.read() == f"SETTINGS {i}"
+        with open(os.path.join(dest_root, "single.conf")) as f:
+            assert f.read() == "SINGLE"
+        assert os.path.isfile(os.path.join(existing_dir, "keep.txt"))
+        assert not os.path.exists(os.path.join(dest_root, "missing"))
+        # copytree's default copy2 keeps mtimes
+        dest_file = os.path.join(dest_root, "app1/nested/settings.json")
+        assert os.stat(dest_file).st_mtime == os.stat(source_file).st_mtime
@@ -0,0 +1,108 @@
+import os
+import re
+import sys
+import threading
+import time
+
+sys.path.insert(0, "../shallow_backup")
+import shallow_backup.reinstall
+from shallow_backup.reinstall import reinstall_packages_sb
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class TestReinstallPackages:
+    """
+    Test the commands generated for reinstalling packages
+    """
+
+    @staticmethod
+    def reinstall_dry_run(packages_path, capsys) -> list:
+        """Dry run a package reinstall and return the stripped, non-empty output lines"""
+        reinstall_packages_sb(str(packages_path), dry_run=True)
+        output = ANSI_ESCAPE.sub("", capsys.readouterr().out)
+        return [line.strip() for line in output.splitlines() if line.strip()]
+
+    def test_reinstall_packages_dry_run(self, tmp_path, capsys):
+        """
+        Test that each detected package manager gets the right command, printed
+        right after its header
+        """
+        for file in [
+            "brew_list.txt",
+            "npm_list.txt",
+            "pip_list.txt",
+            "pip3_list.txt",
+            "gem_list.txt",
+            "cargo_list.txt",
+        ]:
+            with open(os.path.join(tmp_path, file), "w+") as f:
+                f.write("TRASH\n")
+        with open(os.path.join(tmp_path, "vscode_list.txt"), "w+") as f:
+            f.write("ms-python.python\n\nesbenp.prettier-vscode\n")
+
+        lines = self.reinstall_dry_run(tmp_path, capsys)
+        expected_cmds = {
+            "brew": f"$ brew bundle install --no-lock --file {tmp_path}/brew_list.txt",
+            "npm": f"$ xargs npm install -g < {tmp_path}/npm_list.txt",
+            "pip": f"$ pip install -r {tmp_path}/pip_list.txt",
+            "pip3": f"$ pip3 install -r {tmp_path}/pip3_list.txt",
+            "gem": f"$ xargs -L 1 gem install < {tmp_path}/gem_list.txt",
+            "cargo": f"$ xargs -L 1 cargo install < {tmp_path}/cargo_list.txt",
+            "vscode": "$ code --install-extension ms-python.python --install-extension esbenp.prettier-vscode",
+        }
+        for pm, cmd in expected_cmds.items():
+            header_index = lines.index(f"Reinstalling {pm}...")
+            assert lines[header_index + 1] == cmd
+
+        # pip and pip3 are in the same job, so they are reinstalled back to back
+        pip_index = lines.index(expected_cmds["pip"])
+        pip3_index = lines.index(expected_cmds["pip3"])
+        assert abs(pip_index - pip3_index) == 2
+
+    def test_reinstall_packages_detection(self, tmp_path, capsys):
+        """
+        Test that package managers are detected by their list file prefix
+        """
+        for file in ["pip3_list.txt", "npm_temp_list.json", "macports_list.txt"]:
+            with open(os.path.join(tmp_path, file), "w+") as f:
+                f.write("TRASH\n")
+        with open(os.path.join(tmp_path, "README.md"), "w+") as f:
+            f.write("TRASH\n")
+
+        lines = self.reinstall_dry_run(tmp_path, capsys)
+        headers = {line for line in lines if line.startswith("Reinstalling ")}
+        assert headers == {"Reinstalling pip3...", "Reinstalling npm..."}
+        assert "WARNING: Macports reinstallation is not supported." in lines
+
+    def test_reinstall_packages_brew_runs_first(self, tmp_path, monkeypatch):
+        """
+        Test that brew finishes before any other package manager starts, since
+        it usually installs them
+        """
+        package_mgrs = ["brew", "npm", "pip", "gem", "cargo"]
+        for pm in package_mgrs:
+            with open(os.path.join(tmp_path, f"{pm}_list.txt"), "w+") as f:
+                f.write(f"{pm}-package\n")
+
+        events = []
+        events_lock = threading.Lock()
+
+        def fake_run_cmd(command, stdin=None):
+            program = next(pm for pm in package_mgrs if pm in command.split())
+            with events_lock:
+                events.append(("start", program))
+            if program == "brew":
+                time.sleep(0.1)
+            # Package lists are fed to the command's stdin
+            if stdin:
+                assert stdin.read().decode("utf-8").startswith(program)
+            with events_lock:
+                events.append(("end", program))
+            return None
+
+        monkeypatch.setattr(shallow_backup.reinstall, "run_cmd", fake_run_cmd)
+        reinstall_packages_sb(str(tmp_path), dry_run=False)
+
+        assert events[:2] == [("start", "brew"), ("end", "brew")]
+        assert {program for _, program in events[2:]} == {"npm", "pip", "gem", "cargo"}
@@ -1,8 +1,9 @@
+import os
 import sys
 from .testing_utility_functions import setup_env_vars, unset_env_vars
 
 sys.path.insert(0, "../shallow_backup")
-from shallow_backup.utils import run_cmd_return_bool
+from shallow_backup.utils import run_cmd, run_cmd_return_bool, get_abs_path_subfiles
 
 
 class TestUtilMethods:
@@ -34,3 +35,34 @@ class TestUtilMethods:
 
         should_pass = "[[ -n $SHALLOW_BACKUP_TEST_BACKUP_DIR ]]"
         assert run_cmd_return_bool(should_pass) is True
+
+    def test_get_abs_path_subfiles(self, tmp_path):
+        """Test that all nested files are found, without following symlinked dirs"""
+        nested_dir = os.path.join(tmp_path, "a/b/c")
+        os.makedirs(nested_dir)
+        expected_files = {
+            os.path.join(tmp_path, "top.txt"),
+            os.path.join(tmp_path, "a/middle.txt"),
+            os.path.join(nested_dir, "bottom.txt"),
+        }
+        for file in expected_files:
+            with open(file, "w+") as f:
+                f.write("TRASH")
+        os.symlink(nested_dir, os.path.join(tmp_path, "link-to-dir"))
+
+        assert set(get_abs_path_subfiles(str(tmp_path))) == expected_files
+        assert list(get_abs_path_subfiles(os.path.join(tmp_path, "nope"))) == []
+
+    def test_run_cmd_stdin(self, tmp_path):
+        """Test that an open file passed as stdin is fed to the command"""
+        input_path = os.path.join(tmp_path, "input list.txt")
+        with open(input_path, "w+") as f:
+            f.write("a\nb\n")
+
+        with open(input_path, "rb") as f:
+            process = run_cmd("xargs -L 1 echo pkg", stdin=f)
+        assert process.stdout.decode("utf-8") == "pkg a\npkg b\n"
+
+        # Quoted shell operators are passed through as literal arguments
+        process = run_cmd("echo '<' literal")
+        assert process.stdout.decode("utf-8") == "< literal\n"